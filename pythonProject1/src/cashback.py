@@ -0,0 +1,207 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.utils import logging_setup
+
+logger = logging_setup()
+
+# Программа из README: 1 рубль на каждые 100 рублей расходов
+DEFAULT_PROGRAM: Dict[str, Any] = {"name": "Базовая", "base_rate": 0.01, "rules": []}
+
+PROGRAM_KEYS = {"name", "base_rate", "rules", "monthly_cap"}
+RULE_KEYS = {"rate", "mcc", "categories", "cards", "monthly_cap"}
+
+
+def prepare_transactions(transactions: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Подготавливает таблицу транзакций к расчету кешбэка.
+
+    Оставляет только успешные расходы по картам и переводит нужные столбцы в массивы NumPy,
+    категории и карты кодируются целыми числами. Расходы берутся в рублях (payment_amount),
+    операции, списанные в другой валюте, не учитываются. Результат можно переиспользовать
+    для расчета любого количества программ.
+
+    Args:
+        transactions: DataFrame с транзакциями (формат operations.xls).
+
+    Returns:
+        Словарь с массивами: spent, mcc, category, card, month и справочниками categories, cards.
+    """
+    is_card = transactions["card_number"].astype(str).str.startswith("*")
+    is_rub = transactions["payment_currency"] == "RUB"
+    mask = is_card & is_rub & (transactions["status"] == "OK") & (transactions["payment_amount"] < 0)
+    data = transactions[mask]
+
+    date_operation = pd.to_datetime(data["date_operation"], format="%d.%m.%Y %H:%M:%S")
+    order = np.argsort(date_operation.to_numpy(), kind="stable")
+    data = data.iloc[order]
+    date_operation = date_operation.iloc[order]
+
+    category_codes, categories = pd.factorize(data["category"].astype(str))
+    card_codes, cards = pd.factorize(data["card_number"].str[-4:])
+    month = (date_operation.dt.year * 12 + date_operation.dt.month - 1).to_numpy()
+
+    return {
+        "spent": data["payment_amount"].to_numpy(dtype=float) * -1,
+        "mcc": data["MCC"].fillna(-1).to_numpy(dtype=float),
+        "category": category_codes,
+        "card": card_codes,
+        "month": month - month.min() if len(month) else month,
+        "categories": list(categories),
+        "cards": list(cards),
+    }
+
+
+def _capped_cumsum(values: np.ndarray, groups: np.ndarray, cap: float) -> np.ndarray:
+    """
+    Ограничивает накопленную сумму значений внутри каждой группы величиной cap.
+
+    Порядок значений внутри группы сохраняется: как только накопленная сумма
+    достигает лимита, последующие значения группы обнуляются.
+    Суммы считаются в целых копейках, чтобы результат не накапливал ошибку округления.
+    """
+    if len(values) == 0:
+        return values
+    order = np.argsort(groups, kind="stable")
+    sorted_values = np.rint(values[order] * 100).astype(np.int64)
+    sorted_groups = groups[order]
+    cap_kopecks = int(round(cap * 100))
+
+    cumulative = np.cumsum(sorted_values)
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    offsets = np.repeat(np.r_[0, cumulative[starts[1:] - 1]], np.diff(np.r_[starts, len(values)]))
+    capped = np.minimum(cumulative - offsets, cap_kopecks)
+    capped_values = np.diff(capped, prepend=0)
+    capped_values[starts] = capped[starts]
+
+    result = np.empty_like(values)
+    result[order] = capped_values / 100
+    return result
+
+
+def _validate_program(program: Dict[str, Any]) -> None:
+    """
+    Проверяет описание программы: опечатка в ключе правила сделала бы его условием
+    "все транзакции" и скрыла бы все следующие правила.
+    """
+    unknown = set(program) - PROGRAM_KEYS
+    if unknown:
+        raise ValueError(f"Неизвестные ключи программы: {sorted(unknown)}")
+    for rule in program.get("rules", []):
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Неизвестные ключи правила: {sorted(unknown)}")
+        if "rate" not in rule:
+            raise ValueError("В правиле не задана ставка rate")
+        for key in ("categories", "cards"):
+            if isinstance(rule.get(key), str):
+                raise ValueError(f"{key} должен быть списком, а не строкой")
+
+
+def _rule_mask(prepared: Dict[str, Any], rule: Dict[str, Any]) -> np.ndarray:
+    """
+    Возвращает маску транзакций, подходящих под правило программы.
+    """
+    mask = np.ones(len(prepared["spent"]), dtype=bool)
+    if rule.get("mcc") is not None:
+        low, high = rule["mcc"]
+        mask &= (prepared["mcc"] >= low) & (prepared["mcc"] <= high)
+    if rule.get("categories") is not None:
+        codes = [i for i, name in enumerate(prepared["categories"]) if name in rule["categories"]]
+        mask &= np.isin(prepared["category"], codes)
+    if rule.get("cards") is not None:
+        codes = [i for i, name in enumerate(prepared["cards"]) if name in rule["cards"]]
+        mask &= np.isin(prepared["card"], codes)
+    return mask
+
+
+def transaction_cashback(prepared: Dict[str, Any], program: Dict[str, Any]) -> np.ndarray:
+    """
+    Вычисляет кешбэк по каждой транзакции для заданной программы.
+
+    Программа описывается словарем:
+        name: Название программы.
+        base_rate: Ставка для транзакций, не попавших ни под одно правило.
+        rules: Список правил, проверяются по порядку, срабатывает первое подходящее.
+            Правило содержит rate и необязательные условия mcc (диапазон [от, до]),
+            categories, cards (последние 4 цифры), а также monthly_cap — лимит
+            кешбэка по правилу на карту в месяц.
+        monthly_cap: Общий лимит кешбэка на карту в месяц (необязательно).
+
+    Кешбэк по транзакции округляется вниз до целого рубля.
+    Неизвестные ключи программы или правила приводят к ValueError.
+
+    Args:
+        prepared: Результат prepare_transactions.
+        program: Описание программы кешбэка.
+
+    Returns:
+        Массив кешбэка в том же порядке, что и транзакции в prepared.
+    """
+    _validate_program(program)
+    spent = prepared["spent"]
+    rates = np.full(len(spent), float(program.get("base_rate", 0.0)))
+    rule_index = np.full(len(spent), -1)
+
+    for index, rule in enumerate(program.get("rules", [])):
+        mask = _rule_mask(prepared, rule) & (rule_index == -1)
+        rates[mask] = rule["rate"]
+        rule_index[mask] = index
+
+    cashback: np.ndarray = np.floor(spent * rates)
+    card_month = prepared["card"] * (prepared["month"].max(initial=0) + 1) + prepared["month"]
+
+    for index, rule in enumerate(program.get("rules", [])):
+        if rule.get("monthly_cap") is not None:
+            mask = rule_index == index
+            cashback[mask] = _capped_cumsum(cashback[mask], card_month[mask], rule["monthly_cap"])
+
+    if program.get("monthly_cap") is not None:
+        cashback = _capped_cumsum(cashback, card_month, program["monthly_cap"])
+    return cashback
+
+
+def cashback_by_cards(prepared: Dict[str, Any], program: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Возвращает сумму расходов и кешбэк программы по каждой карте.
+
+    Args:
+        prepared: Результат prepare_transactions.
+        program: Описание программы кешбэка.
+
+    Returns:
+        Список словарей в формате process_cards: last_digits, total_spent, cashback.
+        В отличие от process_cards, total_spent не включает операции, списанные не в рублях.
+    """
+    cashback = transaction_cashback(prepared, program)
+    count = len(prepared["cards"])
+    total_spent = np.bincount(prepared["card"], weights=prepared["spent"], minlength=count)
+    total_cashback = np.bincount(prepared["card"], weights=cashback, minlength=count)
+    return [
+        {"last_digits": card, "total_spent": round(float(spent), 2), "cashback": float(bonus)}
+        for card, spent, bonus in zip(prepared["cards"], total_spent, total_cashback)
+    ]
+
+
+def simulate_programs(transactions: pd.DataFrame, programs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Сравнивает несколько программ кешбэка на одной таблице транзакций.
+
+    Args:
+        transactions: DataFrame с транзакциями.
+        programs: Список описаний программ.
+
+    Returns:
+        Список словарей с названием программы и общей суммой кешбэка,
+        отсортированный по убыванию кешбэка.
+    """
+    prepared = prepare_transactions(transactions)
+    logger.info(f"Расчет {len(programs)} программ кешбэка по {len(prepared['spent'])} транзакциям")
+    results = [
+        {"program": program.get("name", ""), "cashback": float(transaction_cashback(prepared, program).sum())}
+        for program in programs
+    ]
+    results.sort(key=lambda x: x["cashback"], reverse=True)
+    return results
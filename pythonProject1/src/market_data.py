@@ -0,0 +1,304 @@
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import yfinance as yf
+from dotenv import load_dotenv
+
+from src.utils import logging_setup, read_json, write_json
+
+logger = logging_setup()
+
+load_dotenv()
+
+APILAYER_URL = "https://api.apilayer.com/exchangerates_data"
+
+# Цены акций StubServer по умолчанию
+STUB_STOCK_PRICES = {"AAPL": 200.0, "AMZN": 180.0, "GOOGL": 160.0, "MSFT": 420.0, "TSLA": 250.0}
+
+
+class MarketDataProvider(ABC):
+    """
+    Источник рыночных данных: курсы валют к рублю и цены акций.
+    """
+
+    @abstractmethod
+    def currency_rate(self, currency: str) -> Any:
+        pass
+
+    @abstractmethod
+    def stock_price(self, stock: str) -> Any:
+        pass
+
+
+class ReplayedError(Exception):
+    """
+    Ошибка, записанная RecordingProvider и воспроизведенная ReplayProvider.
+    """
+
+
+class RecordingNotFoundError(LookupError):
+    """
+    В записи ReplayProvider нет ответов для запрошенного курса или акции.
+    """
+
+
+class LiveProvider(MarketDataProvider):
+    """
+    Курсы валют из apilayer, цены акций из Yahoo Finance.
+    Адрес apilayer можно заменить (например, на StubServer) через base_url
+    или переменную окружения market_data_url.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 40) -> None:
+        self.base_url = base_url or os.getenv("market_data_url") or APILAYER_URL
+        self.api_key = api_key or os.getenv("api_key") or ""
+        self.timeout = timeout
+
+    def currency_rate(self, currency: str) -> Any:
+        url = f"{self.base_url}/latest?symbols=RUB&base={currency}"
+        response = requests.get(url, headers={"apikey": self.api_key}, timeout=self.timeout)
+        response.raise_for_status()
+        response_data = json.loads(response.text)
+        return response_data["rates"]["RUB"]
+
+    def stock_price(self, stock: str) -> Any:
+        stock_data = yf.Ticker(stock)
+        todays_data = stock_data.history(period="1d")
+        return todays_data["High"].iloc[0]
+
+
+def _to_json(value: Any) -> Any:
+    """
+    Приводит скаляры NumPy (например, цену из yfinance) к обычным числам для записи в JSON.
+    """
+    return value.item() if hasattr(value, "item") else value
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Обертка над другим источником, записывающая все ответы по порядку вместе с ошибками
+    и временем ответа. Записи сохраняются в JSON-файл методом save() или при выходе из with,
+    затем их воспроизводит ReplayProvider.
+    """
+
+    def __init__(self, provider: MarketDataProvider, file_path: str) -> None:
+        self.provider = provider
+        self.file_path = file_path
+        self.records: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, key: str, func: Callable[..., Any], *args: Any) -> Any:
+        start = time.monotonic()
+        try:
+            value = func(*args)
+        except Exception as e:
+            entry = {"error": type(e).__name__, "message": str(e), "latency": time.monotonic() - start}
+            with self._lock:
+                self.records.setdefault(key, []).append(entry)
+            raise
+        with self._lock:
+            self.records.setdefault(key, []).append({"value": value, "latency": time.monotonic() - start})
+        return value
+
+    def currency_rate(self, currency: str) -> Any:
+        return self._record(f"currency:{currency}", self.provider.currency_rate, currency)
+
+    def stock_price(self, stock: str) -> Any:
+        return self._record(f"stock:{stock}", self.provider.stock_price, stock)
+
+    def save(self) -> None:
+        with self._lock:
+            records = {
+                key: [{**entry, "value": _to_json(entry["value"])} if "value" in entry else entry for entry in entries]
+                for key, entries in self.records.items()
+            }
+        write_json(self.file_path, records)
+
+    def __enter__(self) -> "RecordingProvider":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.save()
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Воспроизводит ответы, записанные RecordingProvider, без обращения к сети.
+
+    Ответы по каждому ключу выдаются в порядке записи, после последнего — снова с первого.
+    Записанные ошибки выбрасываются как ReplayedError. Задержка ответа берется из записи,
+    если не задан latency.
+    """
+
+    def __init__(self, file_path: str, latency: Optional[float] = None) -> None:
+        self.records: Dict[str, List[Dict[str, Any]]] = read_json(file_path)
+        self.latency = latency
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _replay(self, key: str) -> Any:
+        if not self.records.get(key):
+            raise RecordingNotFoundError(key)
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(self.records[key])
+        entry = self.records[key][position]
+
+        time.sleep(entry["latency"] if self.latency is None else self.latency)
+        if "error" in entry:
+            raise ReplayedError(f"{entry['error']}: {entry['message']}")
+        return entry["value"]
+
+    def currency_rate(self, currency: str) -> Any:
+        return self._replay(f"currency:{currency}")
+
+    def stock_price(self, stock: str) -> Any:
+        return self._replay(f"stock:{stock}")
+
+
+class StubServer:
+    """
+    Локальный HTTP-сервер, имитирующий эндпоинт apilayer /exchangerates_data/latest
+    и отдающий цены акций по адресу /stocks/<тикер> для StubProvider.
+
+    Args:
+        rates: Курсы валют к рублю, например {"USD": 90.0}.
+        stock_prices: Цены акций, например {"AAPL": 200.0}.
+        latency: Задержка каждого ответа в секундах.
+        error_rate: Доля запросов (от 0 до 1), на которые сервер отвечает ошибкой 500.
+        seed: Зерно генератора случайных чисел для воспроизводимых ошибок.
+        port: Порт, 0 — выбрать свободный.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        stock_prices: Optional[Dict[str, float]] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        port: int = 0,
+    ) -> None:
+        self.rates = rates or {"USD": 90.0, "EUR": 100.0}
+        self.stock_prices = dict(stock_prices or STUB_STOCK_PRICES)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/exchangerates_data"
+
+    @property
+    def stocks_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/stocks"
+
+    def _handler(self) -> Any:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.requests_count += 1
+                    failed = stub._random.random() < stub.error_rate
+                time.sleep(stub.latency)
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                base = query.get("base", ["USD"])[0]
+                stock = url.path.removeprefix("/stocks/")
+                if url.path != "/exchangerates_data/latest" and not url.path.startswith("/stocks/"):
+                    self._send(404, {"message": "no Route matched with those values"})
+                elif failed:
+                    self._send(500, {"message": "Internal Server Error"})
+                elif url.path.startswith("/stocks/"):
+                    if stock in stub.stock_prices:
+                        self._send(200, {"symbol": stock, "High": stub.stock_prices[stock]})
+                    else:
+                        self._send(404, {"message": f"No data found for {stock}"})
+                elif base not in stub.rates:
+                    self._send(400, {"success": False, "error": {"code": 201, "type": "invalid_base_currency"}})
+                else:
+                    self._send(
+                        200,
+                        {
+                            "success": True,
+                            "timestamp": int(time.time()),
+                            "base": base,
+                            "date": time.strftime("%Y-%m-%d"),
+                            "rates": {"RUB": stub.rates[base]},
+                        },
+                    )
+
+            def _send(self, status: int, data: Dict[str, Any]) -> None:
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.info(f"StubServer: {format % args}")
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"StubServer запущен на {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+class StubProvider(LiveProvider):
+    """
+    Источник, полностью работающий через StubServer: и курсы валют, и цены акций
+    берутся с локального сервера, поэтому главную страницу можно измерять без сети.
+    """
+
+    def __init__(self, server: StubServer, timeout: float = 40) -> None:
+        super().__init__(base_url=server.url, api_key="stub", timeout=timeout)
+        self.stocks_url = server.stocks_url
+
+    def stock_price(self, stock: str) -> Any:
+        response = requests.get(f"{self.stocks_url}/{stock}", timeout=self.timeout)
+        response.raise_for_status()
+        return json.loads(response.text)["High"]
+
+
+def main_of_market_data() -> None:
+    """
+    Запускает StubServer для нагрузочного тестирования без обращения к apilayer.
+    """
+    server = StubServer(port=8000, latency=0.1).start()
+    print(f"Укажите market_data_url={server.url} в .env. Enter — остановить сервер.")
+    input()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main_of_market_data()
@@ -1,17 +1,22 @@
-import json
-import os
+import asyncio
+import threading
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
-import requests
-import yfinance as yf
-from dotenv import load_dotenv
+from src.market_data import LiveProvider, MarketDataProvider
+from src.utils import logging_setup, read_json, read_xlsx, write_json
 
-from src.utils import read_json, read_xlsx, write_json
+logger = logging_setup()
 
-load_dotenv()
-# Получение API ключа из переменных окружения
-API_KEY = os.getenv("api_key")
+# Источник курсов валют и цен акций, заменяется через set_provider
+provider: MarketDataProvider = LiveProvider()
+
+CURRENCIES = ["USD", "EUR"]
+STOCKS = ["AAPL", "AMZN", "GOOGL", "MSFT", "TSLA"]
+
+# Таймауты этапов асинхронной сборки дашборда в секундах
+LOAD_TIMEOUT = 60.0
+NETWORK_TIMEOUT = 20.0
 
 
 def greeting(date_time_str: str | None) -> str:
@@ -69,67 +74,187 @@ def top_of_transactions(transactions: List[Dict[str, Any]]) -> List[Dict[str, An
     return transactions[:5]
 
 
+def set_provider(new_provider: MarketDataProvider) -> None:
+    """
+    Заменяет источник рыночных данных (например, на ReplayProvider для тестов без сети).
+    """
+    global provider
+    provider = new_provider
+
+
 def currency_rate(currency: str) -> Any:
     """
     Эта функция получает курс валюты по отношению к рублю с использованием API.
     """
-    url = f"https://api.apilayer.com/exchangerates_data/latest?symbols=RUB&base={currency}"
-    response = requests.get(url, headers={"apikey": API_KEY}, timeout=40)
-    response_data = json.loads(response.text)
-    return response_data["rates"]["RUB"]
+    return provider.currency_rate(currency)
 
 
 def stock_currency(stock: str) -> Any:
     """
     Функция получает текущую цену акции с помощью Yahoo Finance.
     """
-    stock_data = yf.Ticker(stock)
-    todays_data = stock_data.history(period="1d")
-    return todays_data["High"].iloc[0]
+    return provider.stock_price(stock)
 
 
-def main_of_views() -> None:
+def ask_greeting() -> str:
     """
-    Главная функция программы, запускающая обработку транзакций.
+    Запрашивает у пользователя дату и время и возвращает приветствие.
     """
-    # Запрос у пользователя даты и времени
     user_input = input(
         "Введите дату и время в формате YYYY-MM-DD HH:MM:SS " "или нажмите Enter для использования текущего времени: "
     )
-    greet = greeting(user_input if user_input else None)
+    return greeting(user_input if user_input else None)
+
+
+def save_output(output_data: Dict[str, Any]) -> None:
+    """
+    Записывает данные главной страницы в operations_data.json и выводит их.
+    """
+    output_file = "operations_data.json"
+    write_json(output_file, output_data)
+    print(read_json(output_file))
 
-    transactions = read_xlsx("../data/operations.xls")
-    total_expenses = calculate_expenses(transactions)
 
-    card_data = process_cards(transactions)
+def main_of_views() -> None:
+    """
+    Главная функция программы, запускающая обработку транзакций.
+    """
+    greet = ask_greeting()
 
-    top_trans = top_of_transactions(transactions)
+    output_data = {"greeting": greet, **aggregate_transactions("../data/operations.xls")}
+    output_data["currency_rates"] = [{"currency": item, "rate": currency_rate(item)} for item in CURRENCIES]
+    output_data["stock_prices"] = [{"stock": item, "price": stock_currency(item)} for item in STOCKS]
+
+    save_output(output_data)
+
+
+def aggregate_transactions(file_path: str) -> Dict[str, Any]:
+    """
+    Читает файл с транзакциями и считает расходы, данные по картам и топ транзакций.
+    """
+    transactions = read_xlsx(file_path)
+    return {
+        "total_expenses": calculate_expenses(transactions),
+        "card_data": process_cards(transactions),
+        "top_transactions": top_of_transactions(transactions),
+    }
+
+
+def _run_in_thread(loop: asyncio.AbstractEventLoop, func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+    """
+    Запускает блокирующую функцию в фоновом (daemon) потоке и возвращает future с ее результатом.
+
+    Запросы requests и yfinance нельзя прервать: после таймаута поток продолжает работу,
+    но, в отличие от ThreadPoolExecutor, не задерживает завершение программы.
+    """
+    future = loop.create_future()
 
-    currency_rates = [
-        {"currency": "USD", "rate": currency_rate("USD")},
-        {"currency": "EUR", "rate": currency_rate("EUR")},
-    ]
+    def resolve(result: Any, error: Exception | None) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
 
-    stock_prices = [
-        {"stock": "AAPL", "price": stock_currency("AAPL")},
-        {"stock": "AMZN", "price": stock_currency("AMZN")},
-        {"stock": "GOOGL", "price": stock_currency("GOOGL")},
-        {"stock": "MSFT", "price": stock_currency("MSFT")},
-        {"stock": "TSLA", "price": stock_currency("TSLA")},
-    ]
+    def target() -> None:
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            # Цикл событий уже закрыт, результат никому не нужен
+            pass
 
-    output_data = {
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+async def _run_stage(name: str, timeout: float, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Выполняет блокирующую функцию в отдельном потоке с таймаутом.
+    При ошибке или превышении таймаута возвращает None.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(_run_in_thread(loop, func, *args), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Этап {name} не завершился за {timeout} с")
+    except Exception as e:
+        logger.error(f"Ошибка на этапе {name}: {str(e)}")
+    return None
+
+
+async def _fill_rate(item: Dict[str, Any], timeout: float) -> None:
+    """
+    Записывает в item курс валюты item["currency"].
+    """
+    item["rate"] = await _run_stage(f"currency_rate({item['currency']})", timeout, currency_rate, item["currency"])
+
+
+async def _fill_price(item: Dict[str, Any], timeout: float) -> None:
+    """
+    Записывает в item цену акции item["stock"].
+    """
+    item["price"] = await _run_stage(f"stock_currency({item['stock']})", timeout, stock_currency, item["stock"])
+
+
+async def build_dashboard(
+    greet: str,
+    file_path: str,
+    load_timeout: float = LOAD_TIMEOUT,
+    network_timeout: float = NETWORK_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Асинхронно собирает данные для главной страницы.
+
+    Запросы курсов валют и цен акций запускаются сразу и выполняются одновременно
+    с чтением и обработкой файла. Результаты записываются в ответ по мере готовности,
+    этапы, завершившиеся ошибкой или по таймауту, остаются пустыми (None).
+    Запросы, не уложившиеся в таймаут, не прерываются (requests и yfinance этого не умеют),
+    а дорабатывают в фоновых потоках, которые не задерживают выход из программы.
+
+    Args:
+        greet: Приветствие.
+        file_path: Путь к файлу с транзакциями.
+        load_timeout: Таймаут чтения и обработки файла.
+        network_timeout: Таймаут каждого сетевого запроса.
+
+    Returns:
+        Словарь в формате operations_data.json.
+    """
+    output_data: Dict[str, Any] = {
         "greeting": greet,
-        "total_expenses": total_expenses,
-        "card_data": card_data,
-        "top_transactions": top_trans,
-        "currency_rates": currency_rates,
-        "stock_prices": stock_prices,
+        "total_expenses": None,
+        "card_data": None,
+        "top_transactions": None,
+        "currency_rates": [{"currency": currency, "rate": None} for currency in CURRENCIES],
+        "stock_prices": [{"stock": stock, "price": None} for stock in STOCKS],
     }
 
-    output_file = "operations_data.json"
-    write_json(output_file, output_data)
-    print(read_json(output_file))
+    network = asyncio.gather(
+        *[_fill_rate(item, network_timeout) for item in output_data["currency_rates"]],
+        *[_fill_price(item, network_timeout) for item in output_data["stock_prices"]],
+    )
+    aggregate = asyncio.ensure_future(
+        _run_stage("aggregate_transactions", load_timeout, aggregate_transactions, file_path)
+    )
+
+    aggregated: Optional[Dict[str, Any]] = await aggregate
+    if aggregated is not None:
+        output_data.update(aggregated)
+    await network
+    return output_data
+
+
+def main_of_views_async() -> None:
+    """
+    Асинхронный вариант main_of_views: загрузка файла и сетевые запросы выполняются одновременно.
+    """
+    greet = ask_greeting()
+    save_output(asyncio.run(build_dashboard(greet, "../data/operations.xls")))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cashback import (
+    DEFAULT_PROGRAM,
+    cashback_by_cards,
+    prepare_transactions,
+    simulate_programs,
+    transaction_cashback,
+)
+from src.views import process_cards
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date_operation": [
+                "01.01.2022 10:00:00",
+                "02.01.2022 10:00:00",
+                "03.01.2022 10:00:00",
+                "04.01.2022 10:00:00",
+                "01.02.2022 10:00:00",
+                "05.01.2022 10:00:00",
+                "06.01.2022 10:00:00",
+            ],
+            "card_number": ["*1234", "*1234", "*1234", "*5678", "*1234", "*5678", None],
+            "status": ["OK", "OK", "OK", "OK", "OK", "FAILED", "OK"],
+            "transaction_amount": [-1000.0, -2050.0, -500.0, -300.0, -1000.0, -100.0, -100.0],
+            "payment_amount": [-1000.0, -2050.0, -500.0, -300.0, -1000.0, -100.0, -100.0],
+            "payment_currency": ["RUB"] * 7,
+            "category": ["Супермаркеты", "Супермаркеты", "Такси", "Фастфуд", "Супермаркеты", "Такси", "Такси"],
+            "MCC": [5411.0, 5411.0, 4121.0, 5814.0, 5411.0, 4121.0, 4121.0],
+        }
+    )
+
+
+def test_prepare_transactions(transactions: pd.DataFrame) -> None:
+    prepared = prepare_transactions(transactions)
+    assert prepared["cards"] == ["1234", "5678"]
+    np.testing.assert_array_equal(prepared["spent"], [1000.0, 2050.0, 500.0, 300.0, 1000.0])
+    np.testing.assert_array_equal(prepared["month"], [0, 0, 0, 0, 1])
+
+
+def test_default_program(transactions: pd.DataFrame) -> None:
+    prepared = prepare_transactions(transactions)
+    expected_result = [
+        {"last_digits": "1234", "total_spent": 4550.0, "cashback": 45.0},
+        {"last_digits": "5678", "total_spent": 300.0, "cashback": 3.0},
+    ]
+    assert cashback_by_cards(prepared, DEFAULT_PROGRAM) == expected_result
+
+
+def test_first_matching_rule_wins(transactions: pd.DataFrame) -> None:
+    program: dict[str, Any] = {
+        "name": "Такси",
+        "base_rate": 0.0,
+        "rules": [
+            {"rate": 0.1, "categories": ["Такси"]},
+            {"rate": 0.5, "mcc": [4000, 4999]},
+            {"rate": 0.05, "mcc": [5411, 5411], "cards": ["1234"]},
+        ],
+    }
+    cashback = transaction_cashback(prepare_transactions(transactions), program)
+    np.testing.assert_array_equal(cashback, [50.0, 102.0, 50.0, 0.0, 50.0])
+
+
+def test_monthly_caps(transactions: pd.DataFrame) -> None:
+    program: dict[str, Any] = {
+        "name": "С лимитами",
+        "base_rate": 0.1,
+        "rules": [{"rate": 0.05, "categories": ["Супермаркеты"], "monthly_cap": 80}],
+        "monthly_cap": 100,
+    }
+    cashback = transaction_cashback(prepare_transactions(transactions), program)
+    # Январь по карте 1234: 50 + 30 (лимит правила) + 20 (общий лимит), февраль считается заново
+    np.testing.assert_array_equal(cashback, [50.0, 30.0, 20.0, 30.0, 50.0])
+
+
+def test_simulate_programs(transactions: pd.DataFrame) -> None:
+    programs = [DEFAULT_PROGRAM, {"name": "Пять процентов", "base_rate": 0.05}]
+    expected_result = [
+        {"program": "Пять процентов", "cashback": 242.0},
+        {"program": "Базовая", "cashback": 48.0},
+    ]
+    assert simulate_programs(transactions, programs) == expected_result
+
+
+def test_foreign_currency_in_rubles() -> None:
+    transactions = pd.DataFrame(
+        {
+            "date_operation": ["22.12.2020 15:36:58", "23.12.2020 10:00:00"],
+            "card_number": ["*7197", "*7197"],
+            "status": ["OK", "OK"],
+            "transaction_amount": [-519.92, -100.0],
+            "payment_amount": [-40137.82, -100.0],
+            "payment_currency": ["RUB", "CNY"],
+            "category": ["Сервис", "Другое"],
+            "MCC": [5968.0, 5999.0],
+        }
+    )
+    prepared = prepare_transactions(transactions)
+    expected_result = [{"last_digits": "7197", "total_spent": 40137.82, "cashback": 401.0}]
+    assert cashback_by_cards(prepared, DEFAULT_PROGRAM) == expected_result
+    # process_cards суммирует transaction_amount и учитывает операцию, списанную в юанях
+    assert process_cards(transactions.to_dict("records"))[0]["total_spent"] == 619.9
+
+
+def test_caps_are_exact() -> None:
+    transactions = pd.DataFrame(
+        {
+            "date_operation": [f"{day:02d}.01.2022 10:00:00" for day in range(1, 29)] * 100,
+            "card_number": ["*1234"] * 2800,
+            "status": ["OK"] * 2800,
+            "transaction_amount": [-10.0] * 2800,
+            "payment_amount": [-10.0] * 2800,
+            "payment_currency": ["RUB"] * 2800,
+            "category": ["Супермаркеты"] * 2800,
+            "MCC": [5411.0] * 2800,
+        }
+    )
+    program = {"name": "Лимит", "base_rate": 0.1, "monthly_cap": 29.99}
+    cashback = transaction_cashback(prepare_transactions(transactions), program)
+    assert np.count_nonzero(cashback == 1.0) == 29
+    assert np.count_nonzero(cashback == 0.99) == 1
+    assert np.count_nonzero(cashback) == 30
+
+
+@pytest.mark.parametrize(
+    "program",
+    [
+        {"name": "Опечатка", "base_rate": 0.01, "rules": [{"rate": 0.1, "category": ["Такси"]}]},
+        {"name": "Опечатка", "base_rate": 0.01, "monthly_limit": 3000},
+        {"name": "Без ставки", "rules": [{"categories": ["Такси"]}]},
+        {"name": "Строка", "rules": [{"rate": 0.1, "categories": "Такси"}]},
+        {"name": "Строка", "rules": [{"rate": 0.1, "cards": "1234"}]},
+    ],
+)
+def test_invalid_program(transactions: pd.DataFrame, program: Any) -> None:
+    with pytest.raises(ValueError):
+        transaction_cashback(prepare_transactions(transactions), program)
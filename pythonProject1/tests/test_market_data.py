@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import requests
+
+from src import views
+from src.market_data import (
+    LiveProvider,
+    MarketDataProvider,
+    RecordingNotFoundError,
+    RecordingProvider,
+    ReplayedError,
+    ReplayProvider,
+    StubProvider,
+    StubServer,
+)
+
+
+@pytest.fixture
+def stub_server() -> Any:
+    with StubServer(rates={"USD": 90.0, "EUR": 100.0}) as server:
+        yield server
+
+
+def test_live_provider_with_stub_server(stub_server: StubServer) -> None:
+    provider = LiveProvider(base_url=stub_server.url, api_key="test")
+    assert provider.currency_rate("USD") == 90.0
+    assert provider.currency_rate("EUR") == 100.0
+    assert stub_server.requests_count == 2
+
+
+def test_stub_server_errors(stub_server: StubServer) -> None:
+    provider = LiveProvider(base_url=stub_server.url, api_key="test")
+    with pytest.raises(requests.HTTPError):
+        provider.currency_rate("GBP")
+
+    stub_server.error_rate = 1.0
+    with pytest.raises(requests.HTTPError):
+        provider.currency_rate("USD")
+
+
+def test_record_and_replay(stub_server: StubServer, tmp_path: Any) -> None:
+    file_path = str(tmp_path / "market_data.json")
+    with RecordingProvider(LiveProvider(base_url=stub_server.url, api_key="test"), file_path) as recorder:
+        assert recorder.currency_rate("USD") == 90.0
+        stub_server.error_rate = 1.0
+        with pytest.raises(requests.HTTPError):
+            recorder.currency_rate("USD")
+        stub_server.error_rate = 0.0
+        stub_server.rates["USD"] = 95.0
+        assert recorder.currency_rate("USD") == 95.0
+
+    replay = ReplayProvider(file_path, latency=0.0)
+    assert replay.currency_rate("USD") == 90.0
+    with pytest.raises(ReplayedError):
+        replay.currency_rate("USD")
+    assert replay.currency_rate("USD") == 95.0
+    # После последней записи воспроизведение начинается заново
+    assert replay.currency_rate("USD") == 90.0
+    with pytest.raises(RecordingNotFoundError):
+        replay.stock_price("AAPL")
+
+
+def test_recording_returns_values_unchanged(tmp_path: Any) -> None:
+    class NumpyProvider(MarketDataProvider):
+        def currency_rate(self, currency: str) -> Any:
+            return "нет данных"
+
+        def stock_price(self, stock: str) -> Any:
+            return np.float64(200.5)
+
+    file_path = str(tmp_path / "market_data.json")
+    with RecordingProvider(NumpyProvider(), file_path) as recorder:
+        assert recorder.currency_rate("USD") == "нет данных"
+        assert isinstance(recorder.stock_price("AAPL"), np.float64)
+
+    replay = ReplayProvider(file_path, latency=0.0)
+    assert replay.currency_rate("USD") == "нет данных"
+    assert replay.stock_price("AAPL") == 200.5
+
+
+def test_incomplete_provider() -> None:
+    class CurrencyOnly(MarketDataProvider):
+        def currency_rate(self, currency: str) -> Any:
+            return 90.0
+
+    with pytest.raises(TypeError):
+        CurrencyOnly()  # type: ignore[abstract]
+
+
+def test_views_use_provider(tmp_path: Any, monkeypatch: Any) -> None:
+    file_path = str(tmp_path / "market_data.json")
+    records = {
+        "currency:USD": [{"value": 90.0, "latency": 0.0}],
+        "currency:EUR": [{"value": 100.0, "latency": 0.0}],
+        "stock:AAPL": [{"value": 200.0, "latency": 0.0}],
+    }
+    views.write_json(file_path, records)
+    monkeypatch.setattr(views, "provider", views.provider)
+    monkeypatch.setattr(views, "read_xlsx", lambda file_path: [])
+    views.set_provider(ReplayProvider(file_path))
+
+    assert views.currency_rate("EUR") == 100.0
+    assert views.stock_currency("AAPL") == 200.0
+
+    result = asyncio.run(views.build_dashboard("Добрый день!", "operations.xls"))
+    assert result["currency_rates"] == [{"currency": "USD", "rate": 90.0}, {"currency": "EUR", "rate": 100.0}]
+    assert result["stock_prices"][0] == {"stock": "AAPL", "price": 200.0}
+    assert result["stock_prices"][1] == {"stock": "AMZN", "price": None}
+
+
+@patch("yfinance.Ticker", side_effect=AssertionError("Запрос к Yahoo Finance"))
+def test_build_dashboard_offline(mock_ticker: Any, stub_server: StubServer, monkeypatch: Any) -> None:
+    monkeypatch.setattr(views, "provider", views.provider)
+    monkeypatch.setattr(views, "read_xlsx", lambda file_path: [])
+    views.set_provider(StubProvider(stub_server))
+
+    result = asyncio.run(views.build_dashboard("Добрый день!", "operations.xls"))
+
+    assert result["currency_rates"] == [{"currency": "USD", "rate": 90.0}, {"currency": "EUR", "rate": 100.0}]
+    assert result["stock_prices"] == [
+        {"stock": "AAPL", "price": 200.0},
+        {"stock": "AMZN", "price": 180.0},
+        {"stock": "GOOGL", "price": 160.0},
+        {"stock": "MSFT", "price": 420.0},
+        {"stock": "TSLA", "price": 250.0},
+    ]
+    assert stub_server.requests_count == 7
+    mock_ticker.assert_not_called()
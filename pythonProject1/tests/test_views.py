@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import unittest
 from typing import Any
 from unittest.mock import Mock, patch
@@ -5,7 +7,17 @@ from unittest.mock import Mock, patch
 import pandas as pd
 import pytest
 
-from src.views import calculate_expenses, greeting, process_cards, read_xlsx, stock_currency, top_of_transactions
+from src.views import (
+    build_dashboard,
+    calculate_expenses,
+    greeting,
+    main_of_views,
+    main_of_views_async,
+    process_cards,
+    read_xlsx,
+    stock_currency,
+    top_of_transactions,
+)
 
 
 # top_transactions
@@ -139,5 +151,92 @@ def test_process_card_data() -> None:
     assert process_cards(operations) == expected_result
 
 
+@patch("src.views.stock_currency", return_value=100.0)
+@patch("src.views.currency_rate", return_value=90.0)
+@patch("src.views.read_xlsx")
+def test_build_dashboard(mock_read_xlsx: Any, mock_currency_rate: Any, mock_stock_currency: Any) -> None:
+    mock_read_xlsx.return_value = [
+        {"card_number": "*1234", "transaction_amount": -100.0, "bonuses_including_cashback": 1}
+    ]
+    result = asyncio.run(build_dashboard("Добрый день!", "operations.xls"))
+
+    assert result["greeting"] == "Добрый день!"
+    assert result["total_expenses"] == 100.0
+    assert result["card_data"] == [{"last_digits": "1234", "total_spent": 100.0, "cashback": 1.0}]
+    assert result["currency_rates"] == [{"currency": "USD", "rate": 90.0}, {"currency": "EUR", "rate": 90.0}]
+    assert [item["price"] for item in result["stock_prices"]] == [100.0] * 5
+    mock_read_xlsx.assert_called_once_with("operations.xls")
+
+
+@patch("src.views.stock_currency")
+@patch("src.views.currency_rate", side_effect=Exception("API недоступен"))
+@patch("src.views.read_xlsx", return_value=[])
+def test_build_dashboard_degrades(mock_read_xlsx: Any, mock_currency_rate: Any, mock_stock_currency: Any) -> None:
+    """Ошибки и таймауты сетевых запросов не мешают собрать остальные данные."""
+
+    release = threading.Event()
+
+    def slow_stock(stock: str) -> float:
+        release.wait(10)
+        return 100.0
+
+    mock_stock_currency.side_effect = slow_stock
+    try:
+        result = asyncio.run(build_dashboard("Добрый день!", "operations.xls", network_timeout=0.05))
+    finally:
+        release.set()
+
+    assert result["total_expenses"] == 0.0
+    assert result["currency_rates"] == [{"currency": "USD", "rate": None}, {"currency": "EUR", "rate": None}]
+    assert [item["price"] for item in result["stock_prices"]] == [None] * 5
+
+
+@patch("src.views.stock_currency", return_value=100.0)
+@patch("src.views.currency_rate")
+@patch("src.views.read_xlsx")
+def test_build_dashboard_overlaps_load_and_network(
+    mock_read_xlsx: Any, mock_currency_rate: Any, mock_stock_currency: Any
+) -> None:
+    """Сетевые запросы стартуют до завершения чтения файла."""
+    requested = threading.Event()
+
+    def rate(currency: str) -> float:
+        requested.set()
+        return 90.0
+
+    def load(file_path: str) -> list:
+        # При последовательном выполнении запрос курса не начнется и ожидание завершится ошибкой
+        if not requested.wait(5):
+            raise TimeoutError("Запрос курса не начался во время чтения файла")
+        return [{"card_number": "*1234", "transaction_amount": -100.0}]
+
+    mock_currency_rate.side_effect = rate
+    mock_read_xlsx.side_effect = load
+    result = asyncio.run(build_dashboard("Добрый день!", "operations.xls"))
+
+    assert result["total_expenses"] == 100.0
+    assert result["currency_rates"] == [{"currency": "USD", "rate": 90.0}, {"currency": "EUR", "rate": 90.0}]
+
+
+@patch("src.views.save_output")
+@patch("src.views.stock_currency", return_value=100.0)
+@patch("src.views.currency_rate", return_value=90.0)
+@patch("src.views.read_xlsx")
+@patch("builtins.input", return_value="2022-04-01 12:00:00")
+def test_sync_and_async_views_match(
+    mock_input: Any, mock_read_xlsx: Any, mock_currency_rate: Any, mock_stock_currency: Any, mock_save_output: Any
+) -> None:
+    """Последовательная и асинхронная главная страница дают одинаковый результат."""
+    mock_read_xlsx.side_effect = lambda file_path: [
+        {"card_number": "*1234", "transaction_amount": -100.0, "bonuses_including_cashback": 1}
+    ]
+    main_of_views()
+    main_of_views_async()
+
+    sync_output, async_output = [call.args[0] for call in mock_save_output.call_args_list]
+    assert sync_output == async_output
+    assert list(sync_output) == list(async_output)
+
+
 if __name__ == "__main__":
     unittest.main()